@@ -1,23 +1,64 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
+import hashlib
+import json
+import os
 import random
 import re
+import shutil
 import sys
 import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AsyncExitStack, contextmanager
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
+from urllib.parse import urljoin, urlparse
 
+import aiohttp
+import orjson
 import requests
-from PIL import Image, UnidentifiedImageError
+from PIL import Image, ImageSequence, UnidentifiedImageError
+from requests_cache import CachedSession
+from tqdm import tqdm
+from urllib3.util import make_headers
 
 API_BASE = "https://7tv.io/v3"
-SESSION = requests.Session()
+# Honors Cache-Control/ETag from the API, so re-runs revalidate with If-None-Match instead of refetching
+SESSION = CachedSession("7tv_cache.sqlite", expire_after=300, cache_control=True)
 SESSION.headers.update({
     "User-Agent": "7TV-Set-Downloader/1.1 (Windows; Python requests)",
     "Accept": "application/json",
+    "Connection": "keep-alive",
+    # gzip/deflate, plus br only when a brotli decoder is installed
+    "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"],
 })
 
 RETRY_STATUSES = {429, 500, 502, 503, 504, 520, 522, 524}
+MAX_CONCURRENCY = 32
+
+_SANITIZE_RE = re.compile(r"[^A-Za-z0-9._-]+")
+_SET_RE = re.compile(r"/emote-sets/([A-Za-z0-9]+)")
+_USER_RE = re.compile(r"/users/([A-Za-z0-9]+)")
+
+SCALES = ("1x", "2x", "3x", "4x")
+
+
+def _scale_priority(exts):
+    return {scale: tuple(f"{scale}.{ext}" for ext in exts) for scale in SCALES}
+
+
+SCALE_PRIORITY_STATIC = _scale_priority(("png", "webp", "avif"))
+SCALE_PRIORITY_ANIMATED = _scale_priority(("gif", "webp", "avif"))
+SCALE_PRIORITY_STATIC_WEBP = _scale_priority(("webp", "png", "avif"))
+SCALE_PRIORITY_ANIMATED_WEBP = _scale_priority(("webp", "gif", "avif"))
+SCALE_PRIORITY_ANIMATED_AVIF = _scale_priority(("avif", "webp", "gif"))
+
+GIF_TRANSPARENT_INDEX = 255
+
+ETAGS_FILE = ".etags.json"
 
 
 def parse_args():
@@ -25,27 +66,81 @@ def parse_args():
         description="Download all emotes from a 7TV emote set in 2x scale as PNG/GIF."
     )
     p.add_argument("url", help="7TV user or emote-set URL, e.g. https://7tv.app/users/<id> or /emote-sets/<id>")
-    p.add_argument("--scale", default="2x", choices=["1x", "2x", "3x", "4x"], help="Scale to download (default: 2x)")
+    p.add_argument("--scale", default="2x", choices=SCALES, help="Scale to download (default: 2x)")
     p.add_argument("--no-convert", action="store_true", help="Do not convert WEBP/AVIF to PNG/GIF; save as-is")
+    p.add_argument("--prefer-webp", action="store_true", help="Prefer WEBP sources and save them as .webp without conversion")
+    p.add_argument("--animated-format", default="gif", choices=["gif", "webp", "avif"],
+                   help="Preferred animated source format; with webp/avif, any WEBP/AVIF source is kept as-is (default: gif)")
     p.add_argument("--timeout", type=int, default=20, help="HTTP timeout seconds (default: 20)")
+    p.add_argument("--concurrency", type=int, default=16, help=f"Parallel downloads (default: 16, max: {MAX_CONCURRENCY})")
+    p.add_argument("--rps", type=float, default=0, help="Max CDN requests per second per host (default: 0 = unlimited)")
     p.add_argument("--out", default=None, help="Output directory (optional; default derives from user/set name)")
     return p.parse_args()
 
 
 def sanitize(s: str) -> str:
-    return re.sub(r"[^A-Za-z0-9._-]+", "_", s or "").strip("_") or "unnamed"
+    return _SANITIZE_RE.sub("_", s or "").strip("_") or "unnamed"
+
+
+def _tmp_path(path: Path) -> Path:
+    # Unique per write: emotes whose names sanitize to the same file may be written concurrently
+    return path.with_name(f"{path.name}.{uuid.uuid4().hex[:12]}.tmp")
+
+
+@contextmanager
+def atomic_target(path: Path):
+    """Yield a temp path to write to; it is renamed over path on success and removed if the block fails."""
+    tmp = _tmp_path(path)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write data via a sibling temp file and rename it over path, so a crash never leaves a partial file."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0) | getattr(os, "O_SEQUENTIAL", 0)
+    with atomic_target(path) as tmp:
+        fd = os.open(tmp, flags, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+
+def copy_atomic(src: Path, dst: Path):
+    with atomic_target(dst) as tmp:
+        shutil.copyfile(src, tmp)
+
+
+def load_json_file(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_json_file(path: Path, data: dict):
+    try:
+        write_atomic(path, json.dumps(data).encode("utf-8"))
+    except OSError as e:
+        tqdm.write(f"- could not write {path}: {e}")
 
 
 def http_get_json(url: str, timeout: int, max_retries: int = 6, base_backoff: float = 0.7):
     last_err = None
     for attempt in range(1, max_retries + 1):
         try:
-            sep = "&" if "?" in url else "?"
-            r = SESSION.get(f"{url}{sep}_ts={int(time.time() * 1000)}", timeout=timeout)
+            r = SESSION.get(url, timeout=timeout)
             if r.status_code in RETRY_STATUSES:
                 raise requests.HTTPError(f"HTTP {r.status_code}", response=r)
             r.raise_for_status()
-            return r.json()
+            return orjson.loads(r.content)
         except Exception as e:
             last_err = e
             if attempt == max_retries:
@@ -56,10 +151,10 @@ def http_get_json(url: str, timeout: int, max_retries: int = 6, base_backoff: fl
 
 
 def extract_ids(url: str):
-    m_set = re.search(r"/emote-sets/([A-Za-z0-9]+)", url)
+    m_set = _SET_RE.search(url)
     if m_set:
         return {"type": "set", "id": m_set.group(1)}
-    m_user = re.search(r"/users/([A-Za-z0-9]+)", url)
+    m_user = _USER_RE.search(url)
     if m_user:
         return {"type": "user", "id": m_user.group(1)}
     raise ValueError("Could not extract /emote-sets/<id> or /users/<id> from URL.")
@@ -99,23 +194,25 @@ def fetch_emote_set(set_id: str, timeout: int):
     return http_get_json(f"{API_BASE}/emote-sets/{set_id}", timeout)
 
 
-def best_file_for_emote(emote, scale: str):
+def best_file_for_emote(emote, scale: str, prefer_webp: bool = False, animated_format: str = "gif"):
     data = emote.get("data", {})
     host = data.get("host", {})
     files = host.get("files", [])
     animated = bool(data.get("animated", False))
 
-    priority = []
     if animated:
-        priority = ["gif", "webp", "avif"]
+        if animated_format == "avif":
+            priority = SCALE_PRIORITY_ANIMATED_AVIF
+        elif prefer_webp or animated_format == "webp":
+            priority = SCALE_PRIORITY_ANIMATED_WEBP
+        else:
+            priority = SCALE_PRIORITY_ANIMATED
     else:
-        priority = ["png", "webp", "avif"]
+        priority = SCALE_PRIORITY_STATIC_WEBP if prefer_webp else SCALE_PRIORITY_STATIC
 
     by_name = {f.get("name", "").lower(): f for f in files}
-    for ext in priority:
-        target = f"{scale}.{ext}"
-        f = by_name.get(target)
-        if f:
+    for target in priority[scale]:
+        if f := by_name.get(target):
             return f, animated
 
     for f in files:
@@ -127,71 +224,351 @@ def best_file_for_emote(emote, scale: str):
 
 
 def build_cdn_url(host_url: str, file_name: str):
-    base = host_url or ""
-    if base.startswith("//"):
-        base = "https:" + base
-    if not base:
+    if not host_url:
         return None
-    if base.endswith("/"):
-        return base + file_name
-    return base + "/" + file_name
-
-
-def convert_and_save(content: bytes, out_path: Path, animated: bool, target_ext: str):
+    if host_url.startswith("//"):
+        host_url = "https:" + host_url
+    return urljoin(host_url.rstrip("/") + "/", file_name)
+
+
+def _opaque_mask(frame):
+    return frame.getchannel("A").point(lambda a: 255 if a >= 128 else 0)
+
+
+def quantize_frames(frames):
+    """Map RGBA frames onto one palette built from the opaque pixels of every frame; index 255 is transparency."""
+    masks = [_opaque_mask(f) for f in frames]
+
+    # Transparent areas of the strip are filled with a color that already occurs in the animation,
+    # so they don't cost a palette entry of their own.
+    fill = (0, 0, 0)
+    for f, mask in zip(frames, masks):
+        bbox = mask.getbbox()
+        if bbox:
+            x = next(x for x in range(bbox[0], bbox[2]) if mask.getpixel((x, bbox[1])))
+            fill = f.getpixel((x, bbox[1]))[:3]
+            break
+
+    strip = Image.new("RGB", (sum(f.width for f in frames), max(f.height for f in frames)), fill)
+    x = 0
+    for f, mask in zip(frames, masks):
+        strip.paste(f.convert("RGB"), (x, 0), mask)
+        x += f.width
+    palette = strip.quantize(colors=GIF_TRANSPARENT_INDEX, method=Image.Quantize.FASTOCTREE)
+
+    out = []
+    for f, mask in zip(frames, masks):
+        p = f.convert("RGB").quantize(palette=palette, dither=Image.Dither.NONE)
+        p.paste(GIF_TRANSPARENT_INDEX, mask=mask.point(lambda a: 255 - a))
+        out.append(p)
+    return out
+
+
+def convert_and_save(content: bytes, out_path: str, animated: bool, target_ext: str):
+    out_path = Path(out_path)
+    # BytesIO over an immutable bytes object shares its buffer instead of copying it; the one stream
+    # backs both the is_animated probe and frame decoding, and load() initialises the decoder up front.
     try:
         im = Image.open(BytesIO(content))
-    except UnidentifiedImageError:
-        out_path.with_suffix(out_path.suffix + ".orig").write_bytes(content)
+        im.load()
+    except (UnidentifiedImageError, OSError):
+        write_atomic(out_path.with_suffix(out_path.suffix + ".orig"), content)
         return False
 
     if animated and getattr(im, "is_animated", False) and target_ext.lower() == "gif":
         frames = []
         durations = []
         try:
-            for i in range(im.n_frames):
-                im.seek(i)
-                frames.append(im.convert("RGBA"))
-                durations.append(im.info.get("duration", 100))
+            for frame in ImageSequence.Iterator(im):
+                frames.append(frame.convert("RGBA"))
+                durations.append(frame.info.get("duration", 100))
         except Exception:
             frames = [im.convert("RGBA")]
             durations = [100]
 
+        frames = quantize_frames(frames)
         first, rest = frames[0], frames[1:] or []
-        first.save(
-            out_path,
-            save_all=True,
-            append_images=rest,
-            loop=0,
-            duration=durations if len(durations) == len(frames) else 100,
-        )
+        with atomic_target(out_path) as tmp:
+            first.save(
+                tmp,
+                format="GIF",
+                save_all=True,
+                append_images=rest,
+                loop=0,
+                duration=durations if len(durations) == len(frames) else 100,
+                disposal=2,
+                optimize=False,
+                transparency=GIF_TRANSPARENT_INDEX,
+            )
         return True
 
     if target_ext.lower() == "png":
-        im.convert("RGBA").save(out_path, format="PNG")
+        if im.mode != "RGBA":
+            im = im.convert("RGBA")
+        with atomic_target(out_path) as tmp:
+            im.save(tmp, format="PNG", optimize=False, compress_level=6)
         return True
 
-    out_path.with_suffix(out_path.suffix + ".orig").write_bytes(content)
+    write_atomic(out_path.with_suffix(out_path.suffix + ".orig"), content)
     return False
 
 
-def download_bytes(url: str, timeout: int, max_retries: int = 5, base_backoff: float = 0.5):
+class RateLimiter:
+    """Token bucket allowing `rps` requests per second, with bursts of up to `burst`."""
+
+    def __init__(self, rps: float, burst: int | None = None):
+        self.rate = rps
+        self.capacity = burst or max(1, int(rps))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def _get_with_retries(session: aiohttp.ClientSession, sem: asyncio.Semaphore, url: str, timeout: int,
+                            consume, etag: str | None = None, limiter: RateLimiter | None = None,
+                            max_retries: int = 5, base_backoff: float = 0.5):
+    """Return (consume(response), etag), or (None, etag) when the server answers 304 Not Modified."""
+    headers = {"If-None-Match": etag} if etag else {}
     last_err = None
     for attempt in range(1, max_retries + 1):
         try:
-            r = SESSION.get(url, timeout=timeout)
-            if r.status_code in RETRY_STATUSES:
-                raise requests.HTTPError(f"HTTP {r.status_code}", response=r)
-            r.raise_for_status()
-            return r.content
+            if limiter:
+                await limiter.acquire()
+            async with sem:
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+                    if r.status == 304 and etag:
+                        return None, etag
+                    if r.status in RETRY_STATUSES:
+                        raise aiohttp.ClientResponseError(
+                            r.request_info, r.history, status=r.status, message=f"HTTP {r.status}"
+                        )
+                    r.raise_for_status()
+                    return await consume(r), r.headers.get("ETag")
         except Exception as e:
             last_err = e
             if attempt == max_retries:
                 break
             sleep = base_backoff * (2 ** (attempt - 1)) + random.uniform(0.0, 0.4)
-            time.sleep(sleep)
+            await asyncio.sleep(sleep)
     raise last_err
 
 
+async def download_bytes(session: aiohttp.ClientSession, sem: asyncio.Semaphore, url: str, timeout: int,
+                         etag: str | None = None, limiter: RateLimiter | None = None):
+    async def consume(r):
+        return await r.read()
+
+    return await _get_with_retries(session, sem, url, timeout, consume, etag=etag, limiter=limiter)
+
+
+async def download_to_file(session: aiohttp.ClientSession, sem: asyncio.Semaphore, url: str, path: Path,
+                           timeout: int, etag: str | None = None, limiter: RateLimiter | None = None):
+    """Stream the response body straight to path; returns (True, etag), or (None, etag) on 304."""
+    async def consume(r):
+        with atomic_target(path) as tmp, tmp.open("wb", buffering=1 << 20) as f:
+            async for chunk in r.content.iter_chunked(65536):
+                f.write(chunk)
+        return True
+
+    return await _get_with_retries(session, sem, url, timeout, consume, etag=etag, limiter=limiter)
+
+
+@dataclass(slots=True)
+class DownloadJob:
+    name: str
+    url: str
+    ext: str
+    animated: bool
+    target_ext: str
+    direct: bool
+    raw_name: str
+    out_name: str
+
+
+def plan_downloads(emotes, args) -> list[DownloadJob]:
+    scale = args.scale
+    jobs = []
+
+    for e in emotes:
+        name_top = e.get("name") or e.get("data", {}).get("name") or e.get("id", "emote")
+        name = sanitize(name_top)
+        host_url = e.get("data", {}).get("host", {}).get("url")
+
+        if not host_url:
+            tqdm.write(f"- {name}: missing host.url → skipped")
+            continue
+
+        file_entry, is_animated = best_file_for_emote(e, scale, args.prefer_webp, args.animated_format)
+        if not file_entry:
+            tqdm.write(f"- {name}: no file available at scale {scale} → skipped")
+            continue
+
+        cdn_url = build_cdn_url(host_url, file_entry.get("name", ""))
+        if not cdn_url:
+            tqdm.write(f"- {name}: invalid CDN URL → skipped")
+            continue
+
+        ext = (file_entry.get("name") or "").split(".")[-1].lower()
+        target_ext = "gif" if is_animated else "png"
+        direct = (
+            args.no_convert
+            or ext == target_ext
+            or (args.prefer_webp and ext == "webp")
+            or (is_animated and args.animated_format != "gif" and ext in ("webp", "avif"))
+        )
+        raw_name = f"{name}_{scale}.{ext}"
+        out_name = raw_name if direct else f"{name}_{scale}.{target_ext}"
+        jobs.append(DownloadJob(name, cdn_url, ext, is_animated, target_ext, direct, raw_name, out_name))
+
+    return jobs
+
+
+async def run_jobs(jobs: list[DownloadJob], outdir: Path, args):
+    """Download and save all jobs; returns (saved, failed)."""
+    timeout = args.timeout
+    loop = asyncio.get_running_loop()
+    concurrency = min(max(1, args.concurrency), MAX_CONCURRENCY)
+    sem = asyncio.Semaphore(concurrency)
+    workers = os.cpu_count() or 1
+    convert_sem = asyncio.Semaphore(2 * workers)
+    etags_path = outdir / ETAGS_FILE
+    etags = load_json_file(etags_path)
+    limiters = {}
+
+    def limiter_for(url: str):
+        if args.rps <= 0:
+            return None
+        host = urlparse(url).netloc
+        if host not in limiters:
+            limiters[host] = RateLimiter(args.rps)
+        return limiters[host]
+
+    # (blob digest, target ext) -> future resolving to (saved file, .orig file or None) for that content,
+    # or None when its conversion failed and the next alias should try again
+    seen = {}
+
+    def _orig_path(path: Path) -> Path:
+        return path.with_suffix(path.suffix + ".orig")
+
+    async def _convert(pool, job: DownloadJob, blob: bytes, out_path: Path, raw_path: Path):
+        async with convert_sem:
+            ok = await loop.run_in_executor(pool, convert_and_save, blob, str(out_path), job.animated, job.target_ext)
+        if ok:
+            return out_path, None
+        write_atomic(raw_path, blob)
+        tqdm.write(f"+ {job.name}: {raw_path.name} (original, conversion not possible)")
+        orig = _orig_path(out_path)
+        return raw_path, orig if orig.exists() else None
+
+    async def _one(pool, session, job: DownloadJob):
+        raw_path = outdir / job.raw_name
+        out_path = outdir / job.out_name
+
+        # Entries are [etag, filename, conversion_impossible]; a raw file only counts as up to date
+        # when it was written as the fallback for a failed conversion, not by e.g. --no-convert.
+        known_etag = None
+        entry = etags.get(job.url)
+        if entry and (outdir / entry[1]).exists():
+            fallback = len(entry) > 2 and entry[2]
+            if entry[1] == job.out_name or (fallback and not job.direct and entry[1] == job.raw_name):
+                known_etag = entry[0]
+
+        limiter = limiter_for(job.url)
+        try:
+            if job.direct:
+                blob, etag = await download_to_file(session, sem, job.url, out_path, timeout,
+                                                    etag=known_etag, limiter=limiter)
+            else:
+                blob, etag = await download_bytes(session, sem, job.url, timeout, etag=known_etag, limiter=limiter)
+        except Exception as ex:
+            tqdm.write(f"- {job.name}: download failed → {ex}")
+            return False
+
+        if blob is None:
+            pbar.set_postfix_str(f"{job.name} (unchanged)")
+            return True
+
+        if not job.direct:
+            key = (hashlib.blake2b(blob, digest_size=16).digest(), job.target_ext)
+            result = None
+            while (first := seen.get(key)) is not None:
+                result = await first
+                # After a failed conversion, the first alias to wake up replaces the failed future
+                # (without awaiting in between) and retries; the others wait on its attempt.
+                if result is not None or seen.get(key) is first:
+                    break
+
+            if result is not None:
+                src_path, src_orig = result
+                if src_path.suffix != out_path.suffix:
+                    out_path = raw_path
+                copies = []
+                if src_path != out_path:
+                    copies.append((src_path, out_path))
+                if src_orig and src_orig != _orig_path(outdir / job.out_name):
+                    copies.append((src_orig, _orig_path(outdir / job.out_name)))
+                try:
+                    for src_file, dst_file in copies:
+                        await loop.run_in_executor(None, copy_atomic, src_file, dst_file)
+                except Exception as ex:
+                    tqdm.write(f"- {job.name}: copying duplicate failed → {ex}")
+                    return False
+                if out_path == raw_path:
+                    tqdm.write(f"+ {job.name}: {raw_path.name} (original, conversion not possible)")
+            else:
+                fut = seen[key] = loop.create_future()
+                try:
+                    result = await _convert(pool, job, blob, out_path, raw_path)
+                except Exception as ex:
+                    fut.set_result(None)
+                    tqdm.write(f"- {job.name}: conversion failed → {ex}")
+                    return False
+                fut.set_result(result)
+                out_path = result[0]
+
+        if etag:
+            etags[job.url] = [etag, out_path.name, out_path.name != job.out_name]
+        pbar.set_postfix_str(job.name)
+        return True
+
+    async def _tracked(pool, session, job: DownloadJob):
+        try:
+            return await _one(pool, session, job)
+        finally:
+            pbar.update(1)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, tqdm(total=len(jobs), unit="emote", mininterval=0.2) as pbar:
+        # One session/pool per CDN host, so a slow shard can't starve connections to the others
+        by_host = {}
+        for job in jobs:
+            by_host.setdefault(urlparse(job.url).netloc, []).append(job)
+
+        async with AsyncExitStack() as stack:
+            tasks = []
+            for host_jobs in by_host.values():
+                connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency, ttl_dns_cache=300)
+                session = await stack.enter_async_context(
+                    aiohttp.ClientSession(connector=connector, headers={"User-Agent": SESSION.headers["User-Agent"]})
+                )
+                tasks.extend(_tracked(pool, session, job) for job in host_jobs)
+            results = await asyncio.gather(*tasks)
+
+    save_json_file(etags_path, etags)
+    saved = sum(results)
+    return saved, len(results) - saved
+
+
 def derive_outdir(args_out: str | None, source_type: str, meta: dict, fallback_id: str) -> Path:
     if args_out:
         return Path(args_out)
@@ -242,81 +619,9 @@ def main():
     print(f"Emote Set: {title} – {len(emotes)} emotes")
     print(f"Output Directory: {outdir.resolve()}")
 
-    downloaded = 0
-    skipped = 0
-
-    for e in emotes:
-        name_top = e.get("name") or e.get("data", {}).get("name") or e.get("id", "emote")
-        name = sanitize(name_top)
-        host_url = e.get("data", {}).get("host", {}).get("url")
-
-        if not host_url:
-            print(f"- {name}: missing host.url → skipped")
-            skipped += 1
-            continue
-
-        file_entry, is_animated = best_file_for_emote(e, args.scale)
-        if not file_entry:
-            print(f"- {name}: no file available at scale {args.scale} → skipped")
-            skipped += 1
-            continue
-
-        cdn_url = build_cdn_url(host_url, file_entry.get("name", ""))
-        if not cdn_url:
-            print(f"- {name}: invalid CDN URL → skipped")
-            skipped += 1
-            continue
-
-        ext = (file_entry.get("name") or "").split(".")[-1].lower()
-
-        try:
-            blob = download_bytes(cdn_url, args.timeout)
-        except Exception as ex:
-            print(f"- {name}: download failed → {ex}")
-            skipped += 1
-            continue
-
-        if args.no_convert:
-            out_path = outdir / f"{name}_{args.scale}.{ext}"
-            out_path.write_bytes(blob)
-            print(f"+ {name}: {out_path.name} (no conversion)")
-            downloaded += 1
-            continue
-
-        if is_animated:
-            if ext == "gif":
-                out_path = outdir / f"{name}_{args.scale}.gif"
-                out_path.write_bytes(blob)
-                print(f"+ {name}: {out_path.name}")
-                downloaded += 1
-            else:
-                out_path = outdir / f"{name}_{args.scale}.gif"
-                ok = convert_and_save(blob, out_path, animated=True, target_ext="gif")
-                if ok:
-                    print(f"+ {name}: {out_path.name} (converted from {ext.upper()})")
-                else:
-                    raw_path = outdir / f"{name}_{args.scale}.{ext}"
-                    raw_path.write_bytes(blob)
-                    print(f"+ {name}: {raw_path.name} (original, conversion not possible)")
-                downloaded += 1
-        else:
-            if ext == "png":
-                out_path = outdir / f"{name}_{args.scale}.png"
-                out_path.write_bytes(blob)
-                print(f"+ {name}: {out_path.name}")
-                downloaded += 1
-            else:
-                out_path = outdir / f"{name}_{args.scale}.png"
-                ok = convert_and_save(blob, out_path, animated=False, target_ext="png")
-                if ok:
-                    print(f"+ {name}: {out_path.name} (converted from {ext.upper()})")
-                else:
-                    raw_path = outdir / f"{name}_{args.scale}.{ext}"
-                    raw_path.write_bytes(blob)
-                    print(f"+ {name}: {raw_path.name} (original, conversion not possible)")
-                downloaded += 1
-
-        time.sleep(0.03)
+    jobs = plan_downloads(emotes, args)
+    downloaded, failed = asyncio.run(run_jobs(jobs, outdir, args))
+    skipped = len(emotes) - len(jobs) + failed
 
     print(f"Done: {downloaded} files saved, {skipped} skipped.")
 